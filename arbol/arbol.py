@@ -1,8 +1,14 @@
 
+import atexit
+import functools
+import inspect
+import io
 import locale
 import math
+import os
 import sys
 import time
+import types
 from contextlib import contextmanager
 from threading import local
 from typing import Any
@@ -10,9 +16,11 @@ from typing import Any
 try:
     # for color support, install ansicolors
     from colors import color
+    _have_color = True
 except ImportError:
     def color(text: str, fg: str):
         return text
+    _have_color = False
 
 try:
     # For color support on windows:
@@ -21,18 +29,48 @@ try:
 except ImportError:
     pass
 
-class Arbol:
+class _DepthTLS(local):
+    # Subclassing threading.local gives every thread its own 'value' slot,
+    # pre-initialised to 0, so depth reads need no getattr default:
+    value = 0
+
+
+class _ArbolMeta(type):
+    # 'colorful' lives on the metaclass so that plain assignments such as
+    # 'Arbol.colorful = False' rebind _colorise to a branch-free
+    # implementation and invalidate the string caches:
+    @property
+    def colorful(cls):
+        return cls._colorful
+
+    @colorful.setter
+    def colorful(cls, value):
+        cls._colorful = value
+        _bind_colorise()
+
+    # The section depth is stored per-thread so that sections opened in
+    # concurrent threads no longer stomp on each other's indentation; the
+    # property keeps 'Arbol._depth' reads and writes working unchanged, while
+    # hot paths go straight to Arbol._depth_tls.value:
+    @property
+    def _depth(cls):
+        return cls._depth_tls.value
+
+    @_depth.setter
+    def _depth(cls, value):
+        cls._depth_tls.value = value
+
+
+class Arbol(metaclass=_ArbolMeta):
     """ Arborescent (Hierarchical) Logging.
         Python package to organise your stdout prints
         in a hierarchy that follows the structure of your code.
     """
 
-    _depth = 0
-
     # current_section = ''
     passthrough = False
     enable_output = True
-    colorful = True
+    _colorful = True
     max_depth = math.inf
     elapsed_time = True
 
@@ -62,15 +100,67 @@ class Arbol:
         _la_ = '<<'
 
     _thread_local = local()
+    _depth_tls = _DepthTLS()
+
+    # Each thread accumulates its stdout-bound lines in its own buffer so that
+    # many aprints cost a single write; buffers are drained on section exit,
+    # at depth zero (unless autoflush is off), when they grow beyond
+    # _buffer_size, and at interpreter exit:
+    autoflush = True
+    _buffer_size = 64 * 1024
+
+    # Arbol is a namespace/configuration class -- all state is class-level or
+    # thread-local, so instances carry no dict of their own:
+    __slots__ = ()
 
     def __init__(self):
         return
 
     @staticmethod
-    def native_print(*args, sep=' ', end='\n', file=None):
+    def native_print(*args, sep=' ', end='\n', file=None, flush=False):
+        # Thin writer -- the internal callers hand in fully built (and
+        # colorized) lines, but arbitrary objects are accepted like print's:
         if Arbol.enable_output:
-            args = (_colorise(arg, fg=Arbol.c_text) for arg in args)
-            print(*args, sep=sep, end=end, file=file)
+            if file is None:
+                buffer = _get_buffer()
+                buffer.write(sep.join(map(str, args)) + end)
+                if flush or (Arbol.autoflush and Arbol._depth_tls.value == 0) or buffer.tell() > Arbol._buffer_size:
+                    _flush()
+            else:
+                # Drain the thread buffer first so that explicit-file writes
+                # (notably file=sys.stdout) cannot overtake buffered lines:
+                _flush()
+                print(*args, sep=sep, end=end, file=file, flush=flush)
+
+    @staticmethod
+    def flush():
+        """ Drains this thread's buffered output to stdout. """
+        _flush()
+
+    @contextmanager
+    def batched():
+        """ Suspends depth-zero autoflushing within the block so that tight
+            logging loops are drained in as few writes as possible; everything
+            is flushed when the block exits. """
+        previous = Arbol.autoflush
+        Arbol.autoflush = False
+        try:
+            yield
+        finally:
+            Arbol.autoflush = previous
+            _flush()
+
+    @staticmethod
+    def would_emit(depth_delta: int = 0):
+        """ Returns True if an aprint at the current depth (plus an optional
+            delta) would actually produce output -- lets callers skip building
+            expensive messages that would be dropped anyway. """
+        if Arbol.passthrough or getattr(Arbol._thread_local, 'captured', False):
+            return True
+        return Arbol.enable_output and Arbol._depth + depth_delta <= Arbol.max_depth
+
+    def set_colorful(colorful: bool):
+        Arbol.colorful = colorful
 
     def set_log_elapsed_time(log_elapsed_time: bool):
         Arbol.elapsed_time = log_elapsed_time
@@ -79,16 +169,157 @@ class Arbol:
         Arbol.max_depth = max(0, max_depth - 1)
 
 
-def _colorise(text: str, fg: str):
-    if Arbol.colorful:
-        return color(text, fg=fg)
+@functools.lru_cache(maxsize=4096)
+def _colorise_cached(text: str, fg: str):
+    return color(text, fg=fg)
+
+
+def _colorise_on(text: str, fg: str = None):
+    # Short strings (glyphs, unit suffixes, headers...) recur constantly,
+    # so memoize those and spare ansicolors from reparsing the hex color;
+    # arbitrary long user lines are colorized directly to keep the cache small:
+    if len(text) < 128:
+        return _colorise_cached(text, fg)
+    return color(text, fg=fg)
+
+
+def _colorise_off(text: str, fg: str = None):
+    return text
+
+
+def _bind_colorise():
+    # Swap in the right implementation once, instead of branching on
+    # Arbol.colorful inside every single _colorise call; the active scaffold
+    # cache follows suit:
+    global _colorise, _prefix_cache
+    if Arbol._colorful and _have_color:
+        _colorise = _colorise_on
+        _prefix_cache = _prefix_cache_color
     else:
-        return text
+        _colorise = _colorise_off
+        _prefix_cache = _prefix_cache_plain
+    _invalidate_cache()
+
+
+# Pre-built runs of the vertical-line glyph indexed by depth, so that a cache
+# miss costs a list lookup instead of an O(depth) character repeat (trees
+# deeper than the table fall back to multiplication):
+_VL_REPEAT = tuple(Arbol._vl_ * i for i in range(256))
+
+
+def _vl_run(level: int):
+    return _VL_REPEAT[level] if level < 256 else Arbol._vl_ * level
+
+
+# Caches of scaffold prefixes keyed by (depth, suffix), so that repeated
+# prints at the same depth reuse a single string instead of rebuilding
+# '_vl_ * level + suffix' on every line. Plain and colorized prefixes live in
+# separate dicts; _prefix_cache points at the active one and is swapped by
+# _bind_colorise, so the plain path never even calls _colorise:
+_prefix_cache_plain = {}
+_prefix_cache_color = {}
+_prefix_cache = _prefix_cache_plain
+
+
+def _scaffold(level: int, suffix: str):
+    cache = _prefix_cache
+    key = (level, suffix)
+    try:
+        return cache[key]
+    except KeyError:
+        if cache is _prefix_cache_color:
+            prefix = _colorise(_vl_run(level) + suffix, Arbol.c_scafold)
+        else:
+            prefix = _vl_run(level) + suffix
+        return cache.setdefault(key, prefix)
+
+
+def _invalidate_cache():
+    _prefix_cache_plain.clear()
+    _prefix_cache_color.clear()
+    _colorise_cached.cache_clear()
+
+
+def _get_buffer():
+    tl = Arbol._thread_local
+    buffer = getattr(tl, 'buffer', None)
+    if buffer is None:
+        buffer = tl.buffer = io.StringIO()
+    return buffer
+
+
+def _flush():
+    buffer = _get_buffer()
+    text = buffer.getvalue()
+    if text:
+        buffer.seek(0)
+        buffer.truncate()
+        out = sys.stdout
+        try:
+            # Only write raw when stdout has not been wrapped or replaced
+            # (colorama, capture harnesses...), otherwise the wrapper must
+            # get a chance to process the text:
+            fd = out.fileno() if out is sys.__stdout__ else None
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fd = None
+        if fd is not None:
+            # One encode and one write() syscall for the whole batch,
+            # bypassing print()'s per-call machinery; drain whatever the
+            # stream itself buffered first so ordering is preserved:
+            out.flush()
+            os.write(fd, text.encode(getattr(out, 'encoding', None) or 'utf-8', errors='replace'))
+        else:
+            # Not a real file descriptor (StringIO during capture, some test
+            # harnesses...) -- fall back to a plain write:
+            out.write(text)
+            out.flush()
+
+
+# Make sure nothing buffered is lost on interpreter exit:
+atexit.register(_flush)
+
+# Bind the initial _colorise implementation:
+_bind_colorise()
+
+
+# Pre-warm the colorisation cache with the scaffold glyphs so that even the
+# very first prints hit the cache:
+for _glyph in (Arbol._vl_, Arbol._br_, Arbol._bd_, Arbol._tb_, Arbol._la_):
+    for _fg in (Arbol.c_text, Arbol.c_scafold, Arbol.c_timming, Arbol.c_section, Arbol.c_truncat):
+        _colorise_cached(_glyph, _fg)
+del _glyph, _fg
+
+
+def _format_args(args, sep):
+    # Lazy formatting: a '%'-style format string with arguments, or a single
+    # zero-arg callable, is only resolved here -- after the enable/depth gates
+    # have decided that the line will actually be emitted:
+    if len(args) == 1:
+        # Single argument -- by far the most common call shape:
+        arg = args[0]
+        if type(arg) is str:
+            return arg
+        # Only plain functions/lambdas are treated as lazy message producers;
+        # classes and other callables are printed like any other object:
+        if isinstance(arg, types.FunctionType):
+            return str(arg())
+        return str(arg)
+    if len(args) > 1 and type(args[0]) is str and '%' in args[0]:
+        try:
+            return args[0] % args[1:]
+        except (TypeError, ValueError):
+            # The '%' was a literal in an ordinary message, not a format
+            # directive matching the remaining arguments -- print as usual:
+            pass
+    return sep.join(map(str, args))
 
 
 def aprint(*args: Any, sep=' ', end='\n', file=None, separate_lines=False):
     """
     Arbol version of print. Text will be printed following the arborescent structure of sections.
+    Expensive messages can be deferred past the enable/depth checks by passing
+    a '%'-style format string with its arguments, or a single zero-arg
+    function or lambda.
 
     Parameters
     ----------
@@ -98,67 +329,136 @@ def aprint(*args: Any, sep=' ', end='\n', file=None, separate_lines=False):
 
     """
 
-    if Arbol.passthrough or hasattr(Arbol._thread_local, 'captured') and Arbol._thread_local.captured:
-        print(*args, sep=sep, end=end, file=file)
+    # Alias the class and the attributes read several times below to locals
+    # (LOAD_FAST) instead of repeated global + class-dict lookups:
+    arbol = Arbol
+    tl = arbol._thread_local
 
-    elif Arbol._depth <= Arbol.max_depth:
-        level = min(Arbol.max_depth, Arbol._depth)
-        text = sep.join(tuple(str(arg) for arg in args))+end
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            if line:
-                Arbol.native_print(_colorise(Arbol._vl_ * int(level) + (Arbol._br_ if i == 0 or separate_lines else Arbol._vl_), fg=Arbol.c_scafold) + ' ', end='', file=file)
-                Arbol.native_print(line, sep=sep, end=end, file=file)
+    if arbol.passthrough or getattr(tl, 'captured', False):
+        print(_format_args(args, sep), end=end, file=file)
+        return
 
+    # Inside a truncated section the whole call reduces to this one
+    # thread-local read (the flag is maintained on section enter/exit):
+    if getattr(tl, 'muted', False):
+        return
 
-@contextmanager
-def asection(section_header: str, file=None):
-    """
-    Introduces a 'node' in the tree below which context-bound 'aprints' will be placed.
-    Ideally, you want to carefully choose blocks of code / workflow units so that it forms a 'unit'.
+    # Bail out before any string work when the line would be dropped anyway:
+    depth = arbol._depth_tls.value
+    max_depth = arbol.max_depth
+    if not arbol.enable_output or depth > max_depth:
+        return
 
-    Parameters
-    ----------
-    section_header : section header
+    level = int(min(max_depth, depth))
+    text = _format_args(args, sep)
+    colorise = _colorise
+    c_text = arbol.c_text
 
-    """
+    # Fast path: the overwhelming majority of messages are single-line,
+    # so skip the split/enumerate dance entirely:
+    if end == '\n' and '\n' not in text:
+        if text:
+            arbol.native_print(f"{_scaffold(level, arbol._br_)} {colorise(text, c_text)}", file=file)
+        return
 
-    if Arbol._depth + 1 <= Arbol.max_depth:
-        Arbol.native_print(
-            _colorise(Arbol._vl_ * Arbol._depth + Arbol._bd_, fg=Arbol.c_scafold)
-            + ' ' + _colorise(section_header, fg=Arbol.c_section),
+    lines = f"{text}{end}".split('\n')
+    br = arbol._br_
+    vl = arbol._vl_
+    prefixed = []
+    for i, line in enumerate(lines):
+        if line:
+            prefix = _scaffold(level, br if i == 0 or separate_lines else vl)
+            prefixed.append(f"{prefix} {colorise(line, c_text)}")
+    # One join and one write for the whole block instead of a print per line:
+    if prefixed:
+        arbol.native_print(end.join(prefixed), end=end, file=file)
+
+
+# The clock is read on every timed section enter/exit; bind it once so the
+# hot helpers do a single LOAD_GLOBAL instead of a module attribute chain:
+_perf_counter_ns = time.perf_counter_ns
+
+
+def _enter_section(section_header: str, file=None):
+    # Prints the section header and bumps the depth; returns the state that
+    # _exit_section needs: (entry depth, start time in ns, or 0 when the
+    # section's timing will never be shown).
+    arbol = Arbol
+    tl = arbol._thread_local
+    tls = arbol._depth_tls
+    depth = tls.value
+    max_depth = arbol.max_depth
+
+    # Keep the per-thread mute flag in sync with the new depth: aprints in the
+    # truncated region then bail on a single thread-local read. (Raising
+    # max_depth in the middle of an already truncated section takes effect
+    # when that section exits.)
+    tl.muted = depth + 1 > max_depth
+
+    # Sections opened past the truncation point produce no output at all:
+    # just maintain the depth, don't read the clock, don't build any string.
+    if depth > max_depth:
+        tls.value = depth + 1
+        return depth, 0
+
+    if depth + 1 <= max_depth:
+        arbol.native_print(
+            f"{_scaffold(depth, arbol._bd_)} {_colorise(section_header, arbol.c_section)}",
             file=file
         )  # ≡
-    elif Arbol._depth + 1 == Arbol.max_depth + 1:
-        Arbol.native_print(
-            _colorise(Arbol._vl_ * Arbol._depth
-                      + Arbol._br_ + '=', fg=Arbol.c_scafold)
-            + _colorise(f' {section_header}', fg=Arbol.c_section) + color(' (log tree truncated here)', fg=Arbol.c_truncat),
+        # Depth only changes on section enter/exit, so this is the one place
+        # to pre-warm the prefixes of the new level -- even the very first
+        # aprint inside the section is then a pure cache hit:
+        _scaffold(depth + 1, arbol._br_)
+        _scaffold(depth + 1, arbol._vl_)
+    elif depth + 1 == max_depth + 1:
+        arbol.native_print(
+            f"{_scaffold(depth, arbol._br_ + '=')}"
+            f"{_colorise(f' {section_header}', arbol.c_section)}"
+            f"{color(' (log tree truncated here)', fg=arbol.c_truncat)}",
             file=file
         )
 
-    Arbol._depth += 1
+    # No point in reading the clock for sections whose timing will never be shown:
+    measure = arbol.elapsed_time and depth + 1 <= max_depth
 
-    start = time.time()
-    exception = None
-    try:
-        yield
-    except Exception as e:
-        exception = e
+    tls.value = depth + 1
+
+    return depth, _perf_counter_ns() if measure else 0
+
+
+def _exit_section(depth, start, file=None):
+    # Restores the entry depth and prints the elapsed time and closing line.
+    arbol = Arbol
+    arbol._depth_tls.value = depth
+    arbol._thread_local.muted = depth > arbol.max_depth
+    if depth + 1 <= arbol.max_depth:
 
-    stop = time.time()
+        if start and arbol.elapsed_time:
+            _print_elapsed(_perf_counter_ns() - start, file)
 
-    Arbol._depth -= 1
-    if Arbol._depth + 1 <= Arbol.max_depth:
+        arbol.native_print(_scaffold(depth + 1, ''), file=file)
+        if arbol.autoflush:
+            _flush()
 
-        if Arbol.elapsed_time:
-            elapsed = stop - start
-            _print_elapsed(elapsed, file)
 
-        Arbol.native_print(_colorise(Arbol._vl_ * (Arbol._depth + 1), fg=Arbol.c_scafold), file=file)
+@contextmanager
+def asection(section_header: str, file=None):
+    """
+    Introduces a 'node' in the tree below which context-bound 'aprints' will be placed.
+    Ideally, you want to carefully choose blocks of code / workflow units so that it forms a 'unit'.
 
-        if exception is not None:
-            raise exception
+    Parameters
+    ----------
+    section_header : section header
+
+    """
+
+    depth, start = _enter_section(section_header, file)
+    try:
+        yield
+    finally:
+        _exit_section(depth, start, file)
 
 
 def section(section_header: str, file=None):
@@ -173,11 +473,33 @@ def section(section_header: str, file=None):
     """
 
     def _outer(func):
-        def _wrap(*args, **kwargs):
-            with asection(section_header, file=file):
-                return func(*args, **kwargs)
-
-        return _wrap
+        # The wrappers inline section enter/exit -- no context-manager
+        # allocation or __enter__/__exit__ dispatch per call. Zero-parameter
+        # functions additionally get a wrapper without *args/**kwargs packing;
+        # anything else keeps the generic pass-through. (Generating bespoke
+        # wrappers per signature with exec was considered and rejected as not
+        # worth the obscurity for this library.)
+        try:
+            takes_arguments = bool(inspect.signature(func).parameters)
+        except (TypeError, ValueError):
+            takes_arguments = True
+
+        if takes_arguments:
+            def _wrap(*args, **kwargs):
+                depth, start = _enter_section(section_header, file)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _exit_section(depth, start, file)
+        else:
+            def _wrap():
+                depth, start = _enter_section(section_header, file)
+                try:
+                    return func()
+                finally:
+                    _exit_section(depth, start, file)
+
+        return functools.wraps(func)(_wrap)
 
     return _outer
 
@@ -190,24 +512,25 @@ def acapture():
     https://stackoverflow.com/questions/5136611/capture-stdout-from-a-script
     """
 
+    # One thread-local descriptor traversal for the whole block:
+    tl = Arbol._thread_local
+
     try:
-        # Redirect
-        import io
-        sys.stdout = io.TextIOWrapper(io.BytesIO(), sys.stdout.encoding)
-        sys.stderr = io.TextIOWrapper(io.BytesIO(), sys.stderr.encoding)
+        # Drain anything pending so buffered output cannot leak into the capture:
+        _flush()
+
+        # Redirect -- plain StringIOs, no text->bytes->text roundtrip:
+        sys.stdout = io.StringIO()
+        sys.stderr = io.StringIO()
 
-        Arbol._thread_local.captured = True
+        tl.captured = True
         yield
-        Arbol._thread_local.captured = False
+        tl.captured = False
 
     finally:
         # Read
-        sys.stdout.seek(0)
-        sys.stderr.seek(0)
-        output_stdout = sys.stdout.read()
-        output_stderr = sys.stderr.read()
-        sys.stdout.close()
-        sys.stderr.close()
+        output_stdout = sys.stdout.getvalue()
+        output_stderr = sys.stderr.getvalue()
 
         # Restore
         sys.stdout = sys.__stdout__
@@ -216,55 +539,36 @@ def acapture():
         # Send to arbol:
         aprint(output_stdout, separate_lines=True)
         aprint(output_stderr, file=sys.stderr, separate_lines=True)
-
-
-def _print_elapsed(elapsed, file=None):
-    if elapsed < 0.001:
-        Arbol.native_print(
-            _colorise(Arbol._vl_ * (Arbol._depth + 1)
-                      + Arbol._tb_
-                      + Arbol._la_, fg=Arbol.c_scafold)
-            + _colorise(f' {elapsed * 1000 * 1000:.2f} microseconds', fg=Arbol.c_timming),
+        _flush()
+
+
+# Elapsed-time rendering table: (upper bound in nanoseconds, scale, unit name).
+_ELAPSED_UNITS = (
+    (1_000_000, 1e-3, 'microseconds'),
+    (1_000_000_000, 1e-6, 'milliseconds'),
+    (60 * 10 ** 9, 1e-9, 'seconds'),
+    (60 * 60 * 10 ** 9, 1 / (60 * 1e9), 'minutes'),
+    (24 * 60 * 60 * 10 ** 9, 1 / (60 * 60 * 1e9), 'hours'),
+    (math.inf, 1 / (24 * 60 * 60 * 1e9), 'days'),
+)
+
+
+def _print_elapsed(elapsed_ns, file=None):
+    for threshold, scale, unit in _ELAPSED_UNITS:
+        if elapsed_ns < threshold:
+            break
+    prefix = _scaffold(Arbol._depth + 1, Arbol._tb_ + Arbol._la_)
+    Arbol.native_print(
+        f"{prefix}{_colorise(f' {elapsed_ns * scale:.2f} {unit}', Arbol.c_timming)}",
         file=file
-        )
-    elif elapsed < 1:
-        Arbol.native_print(
-            _colorise(Arbol._vl_ * (Arbol._depth + 1)
-                      + Arbol._tb_
-                      + Arbol._la_, fg=Arbol.c_scafold)
-            + _colorise(f' {elapsed * 1000:.2f} milliseconds', fg=Arbol.c_timming),
-            file=file
-        )
-    elif elapsed < 60:
-        Arbol.native_print(
-            _colorise(Arbol._vl_ * (Arbol._depth + 1)
-                      + Arbol._tb_
-                      + Arbol._la_, fg=Arbol.c_scafold)
-            + _colorise(f' {elapsed:.2f} seconds', fg=Arbol.c_timming),
-            file=file
-        )
-    elif elapsed < 60 * 60:
-        Arbol.native_print(
-            _colorise(Arbol._vl_ * (Arbol._depth + 1)
-                      + Arbol._tb_
-                      + Arbol._la_, fg=Arbol.c_scafold)
-            + _colorise(f' {elapsed / 60:.2f} minutes', fg=Arbol.c_timming),
-            file=file
-        )
-    elif elapsed < 24 * 60 * 60:
-        Arbol.native_print(
-            _colorise(Arbol._vl_ * (Arbol._depth + 1)
-                      + Arbol._tb_
-                      + Arbol._la_, fg=Arbol.c_scafold)
-            + _colorise(f' {elapsed / (60 * 60):.2f} hours', fg=Arbol.c_timming),
-            file=file
-        )
+    )
 
 
 # Some legacy projects are using previous function names, this is deprecated!
 def lprint(*args, sep=' ', end='\n', file=None):
     return aprint(*args, sep=sep, end=end, file=file)
 
+@contextmanager
 def lsection(section_header: str, file=None):
     with asection(section_header, file=file):
         yield
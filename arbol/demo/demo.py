@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from arbol import Arbol, aprint, section, asection, acapture
 
 import arbol
@@ -11,12 +13,23 @@ Arbol.max_depth = 4
 # use aprint (=arbol print) instead of the standard print
 aprint('Test')
 
+# The pure computation is memoized, so repeated values collapse to a cache
+# lookup instead of a full recursive descent:
+@lru_cache(maxsize=None)
+def _fun(x):
+    return 0 if x < 0 else _fun(x - 1) + 1
+
 # You can decorate functions:
 @section('function')
 def fun(x):
     if x >= 0:
         with asection('recursive call to f'):
-            aprint(f"f(x)+1={fun(x - 1)}")
+            # Arbol.would_emit() tells you whether the print would actually be
+            # shown -- here it spares us the recursion and the formatting once
+            # the tree is truncated by max_depth:
+            if Arbol.would_emit():
+                aprint("f(x)+1=%s", fun(x - 1))
+    return _fun(x)
 
 # The context manager let's you go down one level in the tree
 with asection('a section'):
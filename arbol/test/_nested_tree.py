@@ -0,0 +1,62 @@
+from arbol.arbol import Arbol
+
+
+def run_nested_tree(section_cm, print_fn):
+    """ Runs the canonical 7-level nested-section tree through the given
+        section context manager and print function, checking the depth
+        book-keeping along the way. Shared by the modern (asection/aprint)
+        and legacy (lsection/lprint) test variants so the tree is written
+        down only once. """
+
+    print_fn('Test')
+
+    with section_cm('a section'):
+        print_fn('a line')
+        print_fn('another line')
+        print_fn('we are done')
+
+        with section_cm('a subsection'):
+            print_fn('another line')
+            print_fn('we are done')
+
+            with section_cm('a subsection'):
+                print_fn('another line')
+                print_fn('we are done')
+
+                assert Arbol._depth == 3
+
+                with section_cm('a subsection'):
+                    print_fn('another line')
+                    print_fn('we are done')
+
+                    with section_cm('a subsection'):
+                        print_fn('another line')
+                        print_fn('we are done')
+
+                        assert Arbol._depth == 5
+
+                        with section_cm('a subsection'):
+                            print_fn('another line')
+                            print_fn('we are done')
+
+                            with section_cm('a subsection'):
+                                print_fn('another line')
+                                print_fn('we are done')
+
+                                assert Arbol._depth == 7
+
+                        with section_cm('a subsection'):
+                            print_fn('another line')
+                            print_fn('we are done')
+
+                    with section_cm('a subsection'):
+                        print_fn('another line')
+                        print_fn('we are done')
+
+                with section_cm('a subsection'):
+                    print_fn('another line')
+                    print_fn('we are done')
+
+    print_fn('test is finished...')
+
+    assert Arbol._depth == 0
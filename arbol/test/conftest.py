@@ -0,0 +1,28 @@
+import math
+
+import pytest
+
+from arbol.arbol import Arbol
+
+# Canonical Arbol configuration for tests -- kept in one dict so the fixture
+# below is just two passes over the attributes (snapshot, restore) instead of
+# a hand-written get/set per flag:
+_DEFAULTS = {
+    '_depth': 0,
+    'passthrough': False,
+    'enable_output': True,
+    'colorful': False,
+    'max_depth': math.inf,
+    'elapsed_time': True,
+    'autoflush': True,
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_arbol_state():
+    saved = {key: getattr(Arbol, key) for key in _DEFAULTS}
+    for key, value in _DEFAULTS.items():
+        setattr(Arbol, key, value)
+    yield
+    for key, value in saved.items():
+        setattr(Arbol, key, value)
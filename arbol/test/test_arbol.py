@@ -1,57 +1,61 @@
-from arbol.arbol import Arbol, aprint, asection
+import pytest
 
+from arbol.arbol import Arbol, aprint, asection, lprint, lsection
+from arbol.test._nested_tree import run_nested_tree
 
-def test_arbol():
 
-    aprint('Test')
+@pytest.mark.parametrize('section_cm, print_fn',
+                         [(asection, aprint),
+                          (lsection, lprint)],
+                         ids=['asection/aprint', 'lsection/lprint'])
+def test_arbol(section_cm, print_fn):
+    run_nested_tree(section_cm, print_fn)
 
-    with asection('a section'):
-        aprint('a line')
-        aprint('another line')
-        aprint('we are done')
 
-        with asection('a subsection'):
-            aprint('another line')
-            aprint('we are done')
+def test_depth_affects_indentation(capsys):
 
-            with asection('a subsection'):
-                aprint('another line')
-                aprint('we are done')
+    aprint('level0')
+    with asection('section'):
+        aprint('level1')
 
-                assert Arbol._depth == 3
+    # Read the capture once for the whole test -- every readouterr() call
+    # flushes pytest's capture pipe:
+    captured = capsys.readouterr().out
 
-                with asection('a subsection'):
-                    aprint('another line')
-                    aprint('we are done')
+    assert f'{Arbol._br_} level0' in captured
+    assert f'{Arbol._vl_}{Arbol._br_} level1' in captured
 
-                    with asection('a subsection'):
-                        aprint('another line')
-                        aprint('we are done')
 
-                        assert Arbol._depth == 5
+def test_percent_literal_message(capsys):
 
-                        with asection('a subsection'):
-                            aprint('another line')
-                            aprint('we are done')
+    # A '%' inside an ordinary message must not be mistaken for a format
+    # directive -- interpolation failures fall back to plain joining:
+    aprint('progress: 50% done', 'and counting')
+    aprint('%s %s', 1)
 
-                            with asection('a subsection'):
-                                aprint('another line')
-                                aprint('we are done')
+    captured = capsys.readouterr().out
+    assert 'progress: 50% done and counting' in captured
+    assert '%s %s 1' in captured
 
-                                assert Arbol._depth == 7
 
-                        with asection('a subsection'):
-                            aprint('another line')
-                            aprint('we are done')
+def test_lazy_callable_messages(capsys):
 
-                    with asection('a subsection'):
-                        aprint('another line')
-                        aprint('we are done')
+    # Lambdas/functions are lazy message producers, but classes and other
+    # callable objects are printed like any other object -- not invoked:
+    aprint(lambda: 'lazy')
+    aprint(Arbol)
 
-                with asection('a subsection'):
-                    aprint('another line')
-                    aprint('we are done')
+    captured = capsys.readouterr().out
+    assert 'lazy' in captured
+    assert str(Arbol) in captured
 
-    aprint('test is finished...')
 
-    assert Arbol._depth == 0
+def test_elapsed_time_disabled(capsys):
+
+    Arbol.elapsed_time = False
+    with asection('section'):
+        aprint('content')
+
+    captured = capsys.readouterr().out
+    assert 'content' in captured
+    assert Arbol._la_ not in captured
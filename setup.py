@@ -20,19 +20,41 @@ EMAIL = 'loic.royer@czbiohub.org'
 AUTHOR = 'Loic A Royer'
 REQUIRES_PYTHON = '>=3.6.0'
 
-from datetime import datetime
-now = datetime.now()
-seconds_since_midnight = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
-minutes_since_midnight = int(seconds_since_midnight//60)
-ten_minutes_since_midnight = int(seconds_since_midnight//600)
-VERSION = datetime.today().strftime('%Y.%m.%d')+f'.{minutes_since_midnight}'
-print(f"Version: {VERSION}")
+def _compute_version():
+    # Computed lazily: build tools import/execute setup.py several times for
+    # metadata, so this should not run (nor print) at import time.
+    from datetime import datetime
+    now = datetime.now()
+    seconds_since_midnight = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
+    minutes_since_midnight = int(seconds_since_midnight//60)
+    return now.strftime('%Y.%m.%d')+f'.{minutes_since_midnight}'
 
 # What packages are required for this module to be executed?
 REQUIRED = []
 
 # What packages are optional?
-EXTRAS = {'color': ['colorama', 'ansicolors',]}
+EXTRAS = {'color': ['colorama', 'ansicolors',],
+          'build': ['Cython',]}
+
+def _ext_modules():
+    # If Cython is around, compile the hot logging module ahead-of-time in
+    # pure-Python mode -- the source stays plain Python and the package
+    # remains importable everywhere, the compiled extension is just faster.
+    # Computed lazily like the version: C code generation is a build step,
+    # not something importing this file should trigger.
+    try:
+        from Cython.Build import cythonize
+        return cythonize(
+            ['arbol/arbol.py'],
+            language_level=3,
+            compiler_directives={
+                'boundscheck': False,
+                'wraparound': False,
+                'cdivision': True,
+            },
+        )
+    except ImportError:
+        return []
 
 
 
@@ -51,14 +73,8 @@ try:
 except FileNotFoundError:
     long_description = DESCRIPTION
 
-# Load the package's __version__.py module as a dictionary.
+# Filled in right before setup() runs:
 about = {}
-if not VERSION:
-    project_slug = NAME.lower().replace("-", "_").replace(" ", "_")
-    with open(os.path.join(here, project_slug, '__version__.py')) as f:
-        exec(f.read(), about)
-else:
-    about['__version__'] = VERSION
 
 
 class UploadCommand(Command):
@@ -104,37 +120,40 @@ class UploadCommand(Command):
 
 
 # Where the magic happens:
-setup(
-    name=NAME,
-    version=about['__version__'],
-    description=DESCRIPTION,
-    long_description=long_description,
-    long_description_content_type='text/markdown',
-    author=AUTHOR,
-    author_email=EMAIL,
-    python_requires=REQUIRES_PYTHON,
-    url=URL,
-    packages=find_packages(exclude=["tests", "*.tests", "*.tests.*", "tests.*"]),
-    # If your package is a single module, use this instead of 'packages':
-    # py_modules=['mypackage'],
-
-    install_requires=REQUIRED,
-    extras_require=EXTRAS,
-    include_package_data=True,
-    license='MIT',
-    license_file='LICENSE',
-    classifiers=[
-        # Trove classifiers
-        # Full list: https://pypi.python.org/pypi?%3Aaction=list_classifiers
-        "Programming Language :: Python :: 3",
-        "License :: OSI Approved :: BSD License",
-        "Operating System :: OS Independent",
-    ],
-    # $ setup.py publish support.
-    cmdclass={
-        'upload': UploadCommand
-    },
-)
+if __name__ == '__main__':
+    about['__version__'] = _compute_version()
+    setup(
+        name=NAME,
+        version=about['__version__'],
+        description=DESCRIPTION,
+        long_description=long_description,
+        long_description_content_type='text/markdown',
+        author=AUTHOR,
+        author_email=EMAIL,
+        python_requires=REQUIRES_PYTHON,
+        url=URL,
+        packages=find_packages(exclude=["tests", "*.tests", "*.tests.*", "tests.*"]),
+        # If your package is a single module, use this instead of 'packages':
+        # py_modules=['mypackage'],
+
+        install_requires=REQUIRED,
+        extras_require=EXTRAS,
+        ext_modules=_ext_modules(),
+        include_package_data=True,
+        license='MIT',
+        license_file='LICENSE',
+        classifiers=[
+            # Trove classifiers
+            # Full list: https://pypi.python.org/pypi?%3Aaction=list_classifiers
+            "Programming Language :: Python :: 3",
+            "License :: OSI Approved :: BSD License",
+            "Operating System :: OS Independent",
+        ],
+        # $ setup.py publish support.
+        cmdclass={
+            'upload': UploadCommand
+        },
+    )
 
 
 